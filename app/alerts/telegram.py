@@ -3,11 +3,19 @@
 # v1.0.0
 # =============================================================================
 # Sends motion-detection screenshots to a Telegram chat via the Bot API.
+# Alerts upload the JPEG bytes the caller already encoded for the screenshot,
+# so an alert never has to wait for (or re-read) the file on disk.
 #
 # Uses the `python-telegram-bot` library (v20+), which provides an async
 # interface. Because the main detection loop is synchronous (simpler and
 # perfectly adequate for a single-camera system), we bridge the gap by
-# running the async send call inside asyncio.run().
+# submitting the async send call to an event loop that runs for the whole
+# process lifetime on a daemon thread.
+#
+# A single Bot instance (and its HTTP connection pool) is reused for every
+# alert, so only the first send pays for the TCP + TLS handshake with
+# api.telegram.org. The loop is kept alive alongside it because the pooled
+# connections are bound to the loop they were opened on.
 #
 # If sending fails (network error, invalid token, etc.) the failure is
 # logged and the function returns False so the caller can record it in
@@ -15,44 +23,121 @@
 # =============================================================================
 
 import asyncio
+import concurrent.futures
+import io
 import logging
+import sys
+import threading
+from collections.abc import Coroutine
 from pathlib import Path
+from typing import Any
 
 import telegram
+from telegram.request import HTTPXRequest
 
 from app.config import TELEGRAM_TOKEN, TELEGRAM_CHAT_ID
 
 # Module-level logger.
 logger = logging.getLogger(__name__)
 
-
-async def _send_photo_async(photo_path: Path, caption: str) -> bool:
+# ---------------------------------------------------------------------------
+# Optional uvloop
+# ---------------------------------------------------------------------------
+# The alert loop is pure network I/O, so libuv's event loop trims scheduler
+# overhead on every send. uvloop is optional (it doesn't support Windows);
+# without it we fall back to the standard asyncio loop. Only the alert
+# thread's loop is affected — the global event loop policy is left alone.
+# ---------------------------------------------------------------------------
+try:
+    import uvloop
+
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    # Expected on Windows. Noted from _get_loop(), once logging is set up.
+    _new_event_loop = asyncio.new_event_loop
+
+# Upper bound on how long send_alert() waits for Telegram to respond.
+_SEND_TIMEOUT_SECONDS: float = 30.0
+
+# ---------------------------------------------------------------------------
+# Module-level Bot and event loop
+# ---------------------------------------------------------------------------
+# Both are created lazily on the first alert rather than at import time,
+# because the token is only validated at startup (see validate_config) and
+# telegram.Bot rejects an empty token.
+# ---------------------------------------------------------------------------
+_bot: telegram.Bot | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_bot() -> telegram.Bot:
+    """Return the shared Bot instance, creating it on first call."""
+    global _bot
+
+    if _bot is None:
+        _bot = telegram.Bot(
+            token=TELEGRAM_TOKEN,
+            request=HTTPXRequest(
+                connection_pool_size=4,
+                connect_timeout=5,
+                read_timeout=20,
+            ),
+        )
+    return _bot
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first call.
+
+    The loop runs forever on a daemon thread, so it never blocks process
+    exit and there is no per-alert loop startup or teardown.
+    """
+    global _loop
+
+    if _loop is None:
+        if _new_event_loop is asyncio.new_event_loop:
+            logger.debug("uvloop not installed — using the default asyncio event loop.")
+        _loop = _new_event_loop()
+
+        # On Python 3.12+ eager tasks start running synchronously when
+        # scheduled, so a send can reach its first real await without an
+        # extra trip through the loop.
+        if sys.version_info >= (3, 12):
+            _loop.set_task_factory(asyncio.eager_task_factory)
+
+        threading.Thread(
+            target=_loop.run_forever,
+            name="telegram-alerts",
+            daemon=True,
+        ).start()
+    return _loop
+
+
+async def _send_photo_bytes_async(
+    jpeg_bytes: bytes, caption: str, filename: str = "alert.jpg"
+) -> bool:
     """Internal async implementation of the Telegram photo send.
 
-    This is a coroutine that creates a Bot instance, opens the image
-    file, and sends it with a caption to the configured chat.
+    This is a coroutine that sends an in-memory JPEG with a caption to the
+    configured chat using the shared Bot.
 
     Args:
-        photo_path: Absolute path to the JPEG screenshot.
+        jpeg_bytes: The encoded JPEG image.
         caption:    Text to attach below the photo in the message.
+        filename:   Name shown for the attachment in Telegram.
 
     Returns:
         True if the message was sent successfully, False otherwise.
     """
-    # Create a Bot instance. The token authenticates every API request.
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-
     try:
-        # Open the screenshot in binary mode and send as a photo message.
         # Telegram compresses photos automatically; for full-resolution
         # delivery use send_document() instead (larger file, slower).
-        with open(photo_path, "rb") as photo_file:
-            await bot.send_photo(
-                chat_id=TELEGRAM_CHAT_ID,
-                photo=photo_file,
-                caption=caption,
-            )
-        logger.info("Telegram alert sent: %s", photo_path.name)
+        await _get_bot().send_photo(
+            chat_id=TELEGRAM_CHAT_ID,
+            photo=telegram.InputFile(io.BytesIO(jpeg_bytes), filename=filename),
+            caption=caption,
+        )
+        logger.info("Telegram alert sent: %s", filename)
         return True
 
     except telegram.error.TelegramError as exc:
@@ -60,18 +145,51 @@ async def _send_photo_async(photo_path: Path, caption: str) -> bool:
         logger.error("Telegram send failed: %s", exc)
         return False
 
+
+async def _send_photo_async(photo_path: Path, caption: str) -> bool:
+    """Read a screenshot from disk and send it via _send_photo_bytes_async.
+
+    The file is read in a worker thread so the event loop is never blocked
+    on disk I/O.
+
+    Args:
+        photo_path: Absolute path to the JPEG screenshot.
+        caption:    Text to attach below the photo in the message.
+
+    Returns:
+        True if the message was sent successfully, False otherwise.
+    """
+    try:
+        jpeg_bytes = await asyncio.to_thread(photo_path.read_bytes)
     except OSError as exc:
         # File not found, permission denied, etc.
         logger.error("Could not open screenshot for Telegram: %s", exc)
         return False
 
+    return await _send_photo_bytes_async(jpeg_bytes, caption, photo_path.name)
+
+
+def _run_send(coro: Coroutine[Any, Any, bool]) -> bool:
+    """Submit a send coroutine to the background loop and wait for it."""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout=_SEND_TIMEOUT_SECONDS)
+
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        logger.error(
+            "Telegram send timed out after %.0fs.", _SEND_TIMEOUT_SECONDS
+        )
+        return False
+
 
 def send_alert(photo_path: Path, caption: str = "") -> bool:
     """Send a motion-detection screenshot to Telegram.
 
-    This is the synchronous entry point called from the main loop.
-    It wraps the async send in asyncio.run() so callers don't need
-    to manage an event loop.
+    Kept for callers that have a screenshot on disk; the file is read and
+    sent through the same in-memory path as send_alert_bytes(). It submits
+    the async send to the background event loop and waits for the result,
+    so callers don't need to manage a loop.
 
     Args:
         photo_path: Path to the saved JPEG screenshot.
@@ -87,21 +205,25 @@ def send_alert(photo_path: Path, caption: str = "") -> bool:
         caption = f"Motion detected — {photo_path.name}"
 
     logger.info("Sending Telegram alert for: %s", photo_path.name)
+    return _run_send(_send_photo_async(photo_path, caption))
 
-    try:
-        # asyncio.run() creates a new event loop, runs the coroutine to
-        # completion, and then closes the loop. This is the recommended
-        # way to call async code from synchronous contexts in Python 3.10+.
-        return asyncio.run(_send_photo_async(photo_path, caption))
-
-    except RuntimeError as exc:
-        # If an event loop is already running (e.g. inside Jupyter or an
-        # async framework), asyncio.run() raises RuntimeError. In that
-        # edge case, fall back to creating a task on the existing loop.
-        logger.error("asyncio.run() failed: %s — trying fallback.", exc)
-        try:
-            loop = asyncio.get_event_loop()
-            return loop.run_until_complete(_send_photo_async(photo_path, caption))
-        except Exception as inner_exc:
-            logger.error("Fallback also failed: %s", inner_exc)
-            return False
+
+def send_alert_bytes(jpeg_bytes: bytes, caption: str = "") -> bool:
+    """Send an in-memory JPEG to Telegram.
+
+    This is the synchronous entry point called from the main loop. The
+    photo never touches the disk, so the alert doesn't depend on (or wait
+    for) the screenshot being written.
+
+    Args:
+        jpeg_bytes: The (annotated) frame, already JPEG-encoded.
+        caption:    Optional message text. Defaults to a generic alert.
+
+    Returns:
+        True if the alert was delivered, False on any failure.
+    """
+    if not caption:
+        caption = "Motion detected"
+
+    logger.info("Sending Telegram alert (%d bytes).", len(jpeg_bytes))
+    return _run_send(_send_photo_bytes_async(jpeg_bytes, caption))
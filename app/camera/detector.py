@@ -1,17 +1,38 @@
 from __future__ import annotations
 
 import logging
-from collections import Counter
 from dataclasses import dataclass
+from pathlib import Path
 
 import cv2
 import numpy as np
+import torch
+import torch.nn.functional as F
 from ultralytics import YOLO
 
-from app.config import YOLO_MODEL, YOLO_CONFIDENCE, YOLO_CLASSES
+from app.config import (
+    YOLO_MODEL,
+    YOLO_CONFIDENCE,
+    YOLO_CLASSES_SET,
+    YOLO_PRECISION,
+    YOLO_IMGSZ,
+    YOLO_CALIBRATION_DATA,
+)
 
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+# Global torch tuning, applied once at import.
+# ---------------------------------------------------------------------------
+# cudnn.benchmark times the available convolution algorithms on the first
+# call and reuses the fastest; that pays off because every frame is
+# letterboxed to the same input shape. "high" matmul precision lets FP32
+# matmuls use TF32 tensor cores — a tiny loss of mantissa precision that
+# doesn't change detections. Both are no-ops on CPU.
+# ---------------------------------------------------------------------------
+torch.backends.cudnn.benchmark = True
+torch.set_float32_matmul_precision("high")
+
 # ---------------------------------------------------------------------------
 # COCO class ID -> name mapping for the classes we care about.
 # ---------------------------------------------------------------------------
@@ -44,83 +65,292 @@ _ANIMALS = {"cat", "dog", "bird", "horse", "cow", "sheep", "bear"}
 _COLOR_PERSON = (0, 0, 255)    # BGR red
 _COLOR_VEHICLE = (255, 0, 0)   # BGR blue
 _COLOR_ANIMAL = (0, 200, 0)    # BGR green
+_COLOR_OTHER = (255, 255, 255)  # BGR white
 
-
-def _box_color(label: str) -> tuple[int, int, int]:
-    if label == "person":
-        return _COLOR_PERSON
-    if label in _VEHICLES:
-        return _COLOR_VEHICLE
-    if label in _ANIMALS:
-        return _COLOR_ANIMAL
-    return (255, 255, 255)
+# Class id -> BGR colour lookup table, built once so annotate() can index
+# by class id instead of comparing label strings for every box.
+COLOR_LUT: np.ndarray = np.full((max(COCO_CLASS_IDS) + 1, 3), _COLOR_OTHER, np.uint8)
+for _cid, _name in COCO_CLASS_IDS.items():
+    if _name == "person":
+        COLOR_LUT[_cid] = _COLOR_PERSON
+    elif _name in _VEHICLES:
+        COLOR_LUT[_cid] = _COLOR_VEHICLE
+    elif _name in _ANIMALS:
+        COLOR_LUT[_cid] = _COLOR_ANIMAL
 
 
 @dataclass
-class Detection:
-    label: str
-    confidence: float
-    bbox: tuple[int, int, int, int]  # x1, y1, x2, y2
+class Detections:
+    """All detections for one frame, stored as parallel NumPy arrays.
+
+    Row i of each array describes the same box. Keeping the fields in
+    contiguous arrays (rather than one Python object per box) lets
+    consumers count, filter and look up colours with NumPy operations.
+    """
+
+    labels: np.ndarray  # (N,) int32 COCO class ids
+    confs: np.ndarray   # (N,) float32 confidence scores
+    bboxes: np.ndarray  # (N, 4) int32 x1, y1, x2, y2
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def empty(cls) -> Detections:
+        return cls(
+            labels=np.empty(0, np.int32),
+            confs=np.empty(0, np.float32),
+            bboxes=np.empty((0, 4), np.int32),
+        )
 
 
 class YOLODetector:
-    """Wraps ultralytics YOLO for detecting people, vehicles, and animals."""
+    """Wraps ultralytics YOLO for detecting people, vehicles, and animals.
+
+    YOLO is the expensive stage of the pipeline, so it only runs on frames
+    that MotionDetector has already flagged (motion -> YOLO -> alert; see
+    main.py). Keep that order: running YOLO on every frame multiplies GPU
+    load for frames that are almost always static.
+    """
 
     def __init__(self) -> None:
-        # Build the set of allowed COCO class IDs from the config string.
-        allowed_names = {n.strip().lower() for n in YOLO_CLASSES.split(",")}
-        self._allowed_ids: list[int] = [
-            COCO_NAME_TO_ID[n] for n in allowed_names if n in COCO_NAME_TO_ID
-        ]
+        # Map the configured class names to COCO class IDs once. They are
+        # passed as classes= on every call, so the model drops all other
+        # classes inside NMS rather than us filtering results afterwards.
+        self._allowed_ids: list[int] = sorted(
+            COCO_NAME_TO_ID[n] for n in YOLO_CLASSES_SET if n in COCO_NAME_TO_ID
+        )
+        unknown = YOLO_CLASSES_SET - COCO_NAME_TO_ID.keys()
+        if unknown:
+            logger.warning("Ignoring unsupported YOLO_CLASSES: %s", sorted(unknown))
+
+        model_path = self._resolve_model_path()
+        logger.info("Loading YOLO model: %s", model_path)
+        self._model = YOLO(model_path)
 
-        logger.info("Loading YOLO model: %s", YOLO_MODEL)
-        self._model = YOLO(YOLO_MODEL)
+        # On CUDA, frames are staged in a page-locked (pinned) host buffer
+        # and uploaded on a dedicated stream, so the host-to-device copy is
+        # a true async DMA instead of a pageable copy plus implicit sync.
+        # The buffer is allocated on first use, once the frame size is known.
+        self._cuda: bool = torch.cuda.is_available()
+        self._stream: torch.cuda.Stream | None = (
+            torch.cuda.Stream() if self._cuda else None
+        )
+        self._pinned: torch.Tensor | None = None
         logger.info(
             "YOLO ready — confidence=%.2f, classes=%s",
             YOLO_CONFIDENCE,
-            sorted(allowed_names & set(COCO_CLASS_IDS.values())),
+            sorted(YOLO_CLASSES_SET & COCO_NAME_TO_ID.keys()),
         )
 
-    def detect(self, frame: np.ndarray) -> list[Detection]:
-        """Run YOLO inference on a BGR frame.
+    @staticmethod
+    def _resolve_model_path() -> str:
+        """Return the model file to load, exporting a TensorRT engine if needed.
 
-        Returns a list of Detection objects for accepted classes above
-        the confidence threshold.
+        For fp16/int8 precision the .pt weights are exported once to a
+        TensorRT engine cached next to them, which fuses layers and runs on
+        Tensor Cores. The engine name records the precision and input size
+        (e.g. yolov8n_fp16_640.engine), so changing either builds a new
+        engine instead of reusing a stale one. Later launches load the
+        cached engine directly. Without a CUDA GPU, or if the export
+        fails, the plain .pt model is used instead.
         """
-        results = self._model(
-            frame,
-            conf=YOLO_CONFIDENCE,
-            classes=self._allowed_ids,
-            verbose=False,
+        if YOLO_PRECISION == "fp32" or not YOLO_MODEL.endswith(".pt"):
+            return YOLO_MODEL
+
+        if not torch.cuda.is_available():
+            logger.warning(
+                "YOLO_PRECISION=%s needs a CUDA GPU — falling back to %s.",
+                YOLO_PRECISION,
+                YOLO_MODEL,
+            )
+            return YOLO_MODEL
+
+        model_path = Path(YOLO_MODEL)
+        engine_path = model_path.with_name(
+            f"{model_path.stem}_{YOLO_PRECISION}_{YOLO_IMGSZ}.engine"
+        )
+        if engine_path.exists():
+            return str(engine_path)
+
+        export_args: dict = {
+            "format": "engine",
+            "imgsz": YOLO_IMGSZ,
+            "dynamic": False,
+            "workspace": 4,
+        }
+        if YOLO_PRECISION == "int8":
+            export_args["int8"] = True
+            if YOLO_CALIBRATION_DATA:
+                export_args["data"] = YOLO_CALIBRATION_DATA
+        else:
+            export_args["half"] = True
+
+        # Logged as a warning so it shows at the default LOG_LEVEL: startup
+        # otherwise looks hung while the export runs.
+        logger.warning(
+            "Exporting %s to TensorRT (%s, imgsz=%d) as %s — this runs once "
+            "and may take several minutes.",
+            YOLO_MODEL,
+            YOLO_PRECISION,
+            YOLO_IMGSZ,
+            engine_path,
         )
+        try:
+            # Ultralytics always writes <stem>.engine; move it to the
+            # precision- and size-specific cache name, and remove the
+            # intermediate ONNX file the export leaves beside it.
+            exported = Path(YOLO(YOLO_MODEL).export(**export_args))
+            exported.replace(engine_path)
+            exported.with_suffix(".onnx").unlink(missing_ok=True)
+        except Exception as exc:
+            logger.error("TensorRT export failed: %s — using %s.", exc, YOLO_MODEL)
+            return YOLO_MODEL
+        return str(engine_path)
 
-        detections: list[Detection] = []
-        for r in results:
-            for box in r.boxes:
-                cls_id = int(box.cls[0])
-                label = COCO_CLASS_IDS.get(cls_id, f"class_{cls_id}")
-                conf = float(box.conf[0])
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                detections.append(Detection(
-                    label=label,
-                    confidence=conf,
-                    bbox=(int(x1), int(y1), int(x2), int(y2)),
-                ))
-
-        return detections
+    def detect(self, frame: np.ndarray | None) -> Detections:
+        """Run YOLO inference on a BGR frame.
+
+        Returns the detections for accepted classes above the confidence
+        threshold, or no detections if frame is None.
+        """
+        if frame is None:
+            return Detections.empty()
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: list[np.ndarray]) -> list[Detections]:
+        """Run YOLO inference on several BGR frames in a single model call.
+
+        Batching amortises the fixed per-call preprocess, kernel launch and
+        postprocess overhead across all frames (e.g. recent frames from a
+        ring buffer, or one frame per camera). Note that a TensorRT engine
+        exported with dynamic=False only accepts one frame per call.
+
+        Returns one Detections object per input frame, in order.
+        """
+        on_gpu = self._cuda and len({f.shape for f in frames}) == 1
+
+        if on_gpu:
+            with torch.cuda.stream(self._stream):
+                tensor, scale, pad_x, pad_y = self._to_device(frames)
+                results = self._model(
+                    tensor,
+                    imgsz=YOLO_IMGSZ,
+                    conf=YOLO_CONFIDENCE,
+                    classes=self._allowed_ids,
+                    verbose=False,
+                    stream=False,
+                )
+            # The box reads below run on the default stream; make it wait
+            # for the preprocess, inference and NMS kernels queued above.
+            torch.cuda.current_stream().wait_stream(self._stream)
+        else:
+            results = self._model(
+                frames,
+                imgsz=YOLO_IMGSZ,
+                conf=YOLO_CONFIDENCE,
+                classes=self._allowed_ids,
+                verbose=False,
+                stream=False,
+            )
+
+        # Copy each boxes tensor to the host once per frame — every .cpu()
+        # is a GPU sync, so per-box reads would cost one sync per value.
+        batch: list[Detections] = []
+        for frame, r in zip(frames, results):
+            xyxy = r.boxes.xyxy.cpu().numpy()
+            if on_gpu:
+                # Boxes are in letterboxed input coordinates; undo the
+                # padding and scaling to get back to frame pixels.
+                xyxy = (xyxy - (pad_x, pad_y, pad_x, pad_y)) / scale
+                xyxy[:, 0::2] = xyxy[:, 0::2].clip(0, frame.shape[1])
+                xyxy[:, 1::2] = xyxy[:, 1::2].clip(0, frame.shape[0])
+            batch.append(Detections(
+                labels=r.boxes.cls.cpu().numpy().astype(np.int32),
+                confs=r.boxes.conf.cpu().numpy().astype(np.float32),
+                bboxes=xyxy.astype(np.int32),
+            ))
+
+        return batch
+
+    def _to_device(
+        self, frames: list[np.ndarray]
+    ) -> tuple[torch.Tensor, float, int, int]:
+        """Upload same-sized BGR frames and letterbox them on the GPU.
+
+        Must be called inside ``torch.cuda.stream(self._stream)``. The
+        frames are copied into the pinned staging buffer, transferred with
+        non_blocking=True, then converted to RGB, NCHW, float16 in [0, 1]
+        and letterboxed to YOLO_IMGSZ x YOLO_IMGSZ — the same preprocessing
+        Ultralytics would otherwise do on the CPU for NumPy input.
+
+        Returns:
+            The input tensor plus the scale and (x, y) padding applied, so
+            boxes can be mapped back to frame coordinates.
+        """
+        n = len(frames)
+        h, w = frames[0].shape[:2]
+        if self._pinned is None or tuple(self._pinned.shape) != (n, h, w, 3):
+            self._pinned = torch.empty(
+                (n, h, w, 3), dtype=torch.uint8, pin_memory=True
+            )
+
+        staging = self._pinned.numpy()
+        for i, frame in enumerate(frames):
+            np.copyto(staging[i], frame)
+
+        # Upload as uint8 (half the bytes of float16) and convert on the GPU.
+        tensor = self._pinned.to("cuda", non_blocking=True)
+        tensor = tensor.flip(-1).permute(0, 3, 1, 2).half().div_(255)
+
+        # Letterbox: resize to fit, keeping the aspect ratio, then pad the
+        # borders with Ultralytics' grey (114) to a square input.
+        scale = min(YOLO_IMGSZ / h, YOLO_IMGSZ / w)
+        new_h, new_w = round(h * scale), round(w * scale)
+        tensor = F.interpolate(
+            tensor, size=(new_h, new_w), mode="bilinear", align_corners=False
+        )
+        pad_x = (YOLO_IMGSZ - new_w) // 2
+        pad_y = (YOLO_IMGSZ - new_h) // 2
+        tensor = F.pad(
+            tensor,
+            (pad_x, YOLO_IMGSZ - new_w - pad_x, pad_y, YOLO_IMGSZ - new_h - pad_y),
+            value=114 / 255,
+        )
+        return tensor, scale, pad_x, pad_y
 
     @staticmethod
-    def annotate(frame: np.ndarray, detections: list[Detection]) -> np.ndarray:
-        """Draw bounding boxes and labels on a copy of the frame."""
-        annotated = frame.copy()
+    def annotate(
+        frame: np.ndarray,
+        detections: Detections,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Draw bounding boxes and labels on a copy of the frame.
 
-        for det in detections:
-            color = _box_color(det.label)
-            x1, y1, x2, y2 = det.bbox
+        If out is given (same shape and dtype as frame), the copy is made
+        into it instead of a freshly allocated array, so callers can reuse
+        one buffer for every alert. Returns the annotated array.
+        """
+        if out is None:
+            annotated = frame.copy()
+        else:
+            np.copyto(out, frame)
+            annotated = out
+
+        for cls_id, (x1, y1, x2, y2), conf in zip(
+            detections.labels.tolist(),
+            detections.bboxes.tolist(),
+            detections.confs.tolist(),
+        ):
+            label = COCO_CLASS_IDS.get(cls_id, f"class_{cls_id}")
+            if cls_id < len(COLOR_LUT):
+                color = tuple(int(c) for c in COLOR_LUT[cls_id])
+            else:
+                color = _COLOR_OTHER
 
             cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
 
-            text = f"{det.label} {det.confidence:.0%}"
+            text = f"{label} {conf:.0%}"
             (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
             cv2.rectangle(annotated, (x1, y1 - th - 6), (x1 + tw, y1), color, -1)
             cv2.putText(
@@ -131,8 +361,13 @@ class YOLODetector:
         return annotated
 
     @staticmethod
-    def build_caption(detections: list[Detection]) -> str:
+    def build_caption(detections: Detections) -> str:
         """Build a human-readable caption like 'Detected: 2x person, 1x car'."""
-        counts = Counter(d.label for d in detections)
-        parts = [f"{count}x {label}" for label, count in counts.most_common()]
+        ids, counts = np.unique(detections.labels, return_counts=True)
+        # Stable sort so equal counts stay in class-id order.
+        order = np.argsort(-counts, kind="stable")
+        parts = [
+            f"{counts[i]}x {COCO_CLASS_IDS.get(int(ids[i]), f'class_{ids[i]}')}"
+            for i in order
+        ]
         return f"Detected: {', '.join(parts)}"
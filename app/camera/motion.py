@@ -6,16 +6,19 @@
 #
 # Algorithm — simple and lightweight, ideal for CCTV:
 #   1. Capture frame1 and frame2 (consecutive frames).
-#   2. Convert both to grayscale (removes colour noise).
-#   3. Apply Gaussian blur to suppress sensor noise.
+#   2. Downscale and convert both to grayscale (removes colour noise).
+#   3. Apply a 5x5 box blur to suppress sensor noise.
 #   4. difference = abs(frame1 - frame2).
 #   5. Threshold the difference into a binary mask.
 #   6. Dilate to fill gaps between changed pixels.
-#   7. Find contours in the binary mask.
-#   8. If any contour area > MOTION_THRESHOLD → motion detected.
+#   7. Label connected blobs in the binary mask and measure their areas.
+#   8. If any blob area > MOTION_THRESHOLD → motion detected.
 #
 # The detector is stateful: it keeps the previous frame and the timestamp
 # of the last alert so it can enforce a cooldown period.
+#
+# When an OpenCL device is available every step runs on cv2.UMat buffers
+# (OpenCV's transparent API), so the same code executes on the GPU.
 # =============================================================================
 
 from __future__ import annotations
@@ -26,14 +29,19 @@ import logging
 import cv2
 import numpy as np
 
-from app.config import MOTION_THRESHOLD, COOLDOWN_SECONDS
+from app.config import (
+    MOTION_THRESHOLD,
+    COOLDOWN_SECONDS,
+    MOTION_DOWNSCALE,
+    MOTION_USE_OPENCL,
+)
 
 # Module-level logger.
 logger = logging.getLogger(__name__)
 
 
 class MotionDetector:
-    """Detect motion between consecutive video frames using contour area.
+    """Detect motion between consecutive video frames using blob area.
 
     Typical usage inside the main loop::
 
@@ -47,34 +55,70 @@ class MotionDetector:
         self,
         threshold: int = MOTION_THRESHOLD,
         cooldown: int = COOLDOWN_SECONDS,
+        downscale: int = MOTION_DOWNSCALE,
+        use_opencl: bool = MOTION_USE_OPENCL,
     ) -> None:
         """Initialise the detector with tuning parameters.
 
         Args:
-            threshold: Minimum contour area (in pixels) to count as real
-                       motion. Contours smaller than this are treated as
-                       noise and ignored. Default 5000.
+            threshold: Minimum blob area (in full-resolution pixels) to
+                       count as real motion. Blobs smaller than this are
+                       treated as noise and ignored. Default 5000.
             cooldown:  Minimum seconds between successive True returns.
                        Prevents alert flooding during sustained motion.
+            downscale: Shrink factor applied to each axis before analysis.
+                       Default 4 (1/16 of the pixels).
+            use_opencl: Run the pipeline on cv2.UMat buffers via OpenCL
+                       when a device is available.
         """
         # The grayscale + blurred version of the previous frame, used for
-        # differencing. Starts as None; the first frame is always a
-        # "learning" frame and will never trigger motion.
-        self._prev_gray: np.ndarray | None = None
+        # differencing. The first frame is always a "learning" frame and
+        # will never trigger motion.
+        self._prev_gray: np.ndarray | cv2.UMat | None = None
+        self._has_reference: bool = False
+
+        # OpenCL is only used if requested AND a device actually exists.
+        self._use_opencl: bool = use_opencl and cv2.ocl.haveOpenCL()
+        if self._use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+
+        # Work buffers reused by every detect() call, so the resize, blur,
+        # difference and threshold steps write into existing memory instead
+        # of allocating new images per frame. Allocated on the first frame
+        # (and again if the stream resolution changes). They are UMats on
+        # the OpenCL path and plain NumPy arrays otherwise. Two allocations
+        # remain per frame: the OpenCL path uploads each frame into a new
+        # UMat, and blob labelling (Step 9) returns fresh output arrays,
+        # though it only runs for frames that pass the quick reject.
+        self._buf_size: tuple[int, int] | None = None
+        self._buf_small: np.ndarray | cv2.UMat | None = None
+        self._buf_gray: np.ndarray | cv2.UMat | None = None
+        self._buf_blur: np.ndarray | cv2.UMat | None = None
+        self._buf_delta: np.ndarray | cv2.UMat | None = None
+        self._buf_thresh: np.ndarray | cv2.UMat | None = None
 
         # Tunables.
         self._threshold: int = threshold
         self._cooldown: int = cooldown
+        self._downscale: int = max(1, downscale)
 
-        # Timestamp (epoch seconds) of the last positive detection.
-        # Initialised to 0 so the very first motion event is never
-        # suppressed by cooldown.
-        self._last_alert_time: float = 0.0
+        # Blob areas are measured on the downscaled frame, so the
+        # threshold shrinks by the same pixel ratio to keep its meaning.
+        self._scaled_threshold: float = threshold / self._downscale ** 2
+
+        # time.monotonic() reading of the last positive detection. A
+        # monotonic clock can't jump backwards on NTP adjustments. It is
+        # initialised to -inf so the very first motion event is never
+        # suppressed by cooldown (the monotonic epoch may be recent).
+        self._last_alert_monotonic: float = float("-inf")
 
         logger.info(
-            "MotionDetector initialised — threshold=%d px area, cooldown=%ds.",
+            "MotionDetector initialised — threshold=%d px area, cooldown=%ds, "
+            "downscale=%dx, opencl=%s.",
             self._threshold,
             self._cooldown,
+            self._downscale,
+            self._use_opencl,
         )
 
     def detect(self, frame: np.ndarray) -> bool:
@@ -84,26 +128,49 @@ class MotionDetector:
             frame: A BGR image (numpy array) from the camera stream.
 
         Returns:
-            True if a contour exceeding the threshold area is found AND
+            True if a blob exceeding the threshold area is found AND
             the cooldown period has elapsed since the last alert. False
             otherwise.
         """
-        # --- Step 1: Convert to grayscale -----------------------------------
-        # Grayscale reduces the data from 3 channels to 1, making the
+        # --- Step 1: Downscale and convert to grayscale ---------------------
+        # Every later step scales with pixel count, so shrink the frame
+        # first. INTER_AREA averages source pixels, which also smooths
+        # noise. Grayscale reduces the data from 3 channels to 1, making the
         # difference computation faster and less sensitive to colour shifts
         # caused by auto white-balance adjustments.
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        height = frame.shape[0] // self._downscale
+        width = frame.shape[1] // self._downscale
+        self._ensure_buffers(height, width)
 
-        # --- Step 2: Gaussian blur ------------------------------------------
-        # A 21x21 kernel smooths out camera sensor noise and tiny
-        # irrelevant pixel fluctuations (e.g. compression artefacts).
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        # On the OpenCL path, wrapping the frame in a UMat routes every
+        # following OpenCV call to its OpenCL kernel. This allocates a
+        # device buffer and uploads the full-resolution frame each call.
+        if self._use_opencl:
+            frame = cv2.UMat(frame)
+
+        if self._downscale > 1:
+            frame = cv2.resize(
+                frame,
+                (width, height),
+                dst=self._buf_small,
+                interpolation=cv2.INTER_AREA,
+            )
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._buf_gray)
+
+        # --- Step 2: Box blur -----------------------------------------------
+        # A 5x5 mean filter smooths out camera sensor noise and tiny
+        # irrelevant pixel fluctuations (e.g. compression artefacts). It can
+        # be small and unweighted because the area-averaging resize has
+        # already removed most noise; a box filter is separable and runs as
+        # a cheap running sum inside OpenCV.
+        blur = cv2.boxFilter(gray, -1, (5, 5), dst=self._buf_blur)
 
         # --- Step 3: Store first frame as reference -------------------------
         # On the very first call we have no previous frame to compare, so
         # we simply store this one and return False (no motion).
-        if self._prev_gray is None:
-            self._prev_gray = gray
+        if not self._has_reference:
+            self._swap_reference()
+            self._has_reference = True
             logger.debug("First frame stored as reference — no detection yet.")
             return False
 
@@ -111,57 +178,61 @@ class MotionDetector:
         # difference = abs(frame1 - frame2)
         # Each pixel value becomes |current - previous|. Unchanged areas
         # become 0 (black); changed areas become bright.
-        delta = cv2.absdiff(self._prev_gray, gray)
+        delta = cv2.absdiff(self._prev_gray, blur, dst=self._buf_delta)
 
         # --- Step 5: Binary threshold ---------------------------------------
         # Pixels with a difference > 25 (out of 255) are set to 255 (white).
         # The value 25 filters out minor luminance drift while still
         # catching real movement.
-        thresh = cv2.threshold(delta, 25, 255, cv2.THRESH_BINARY)[1]
+        thresh = cv2.threshold(
+            delta, 25, 255, cv2.THRESH_BINARY, dst=self._buf_thresh
+        )[1]
 
         # --- Step 6: Dilation -----------------------------------------------
         # Dilate the white regions to merge nearby blobs into contiguous
         # areas, reducing false fragmentation. Two iterations is a good
         # balance between filling gaps and not over-inflating.
-        thresh = cv2.dilate(thresh, None, iterations=2)
-
-        # --- Step 7: Find contours ------------------------------------------
-        # findContours returns a list of contour outlines. Each contour is
-        # an array of (x,y) points forming the boundary of a white region.
-        # RETR_EXTERNAL: only outermost contours (ignore nested holes).
-        # CHAIN_APPROX_SIMPLE: compress straight segments to save memory.
-        contours, _ = cv2.findContours(
-            thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-        )
+        thresh = cv2.dilate(thresh, None, dst=self._buf_thresh, iterations=2)
 
-        # --- Step 8: Update the reference frame -----------------------------
+        # --- Step 7: Update the reference frame -----------------------------
         # Always update so the detector compares consecutive frames, not
         # the current frame against a stale baseline. This makes it
         # responsive to gradual lighting changes (day/night transition).
-        self._prev_gray = gray
+        # Swapping buffers avoids copying: the old reference becomes the
+        # blur target for the next frame.
+        self._swap_reference()
+
+        # --- Step 8: Quick reject -------------------------------------------
+        # No blob can exceed the threshold if the whole mask doesn't, so a
+        # single vectorised pixel count rejects most quiet frames before
+        # any blob labelling is done.
+        if cv2.countNonZero(thresh) <= self._scaled_threshold:
+            return False
+
+        # --- Step 9: Label connected blobs ----------------------------------
+        # connectedComponentsWithStats labels every 8-connected white region
+        # and returns per-label statistics, including the pixel area, as a
+        # NumPy array — no Python loop over individual blobs.
+        _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8)
+        if isinstance(stats, cv2.UMat):
+            stats = stats.get()
 
-        # --- Step 9: Check contour areas ------------------------------------
-        # If any single contour area > threshold → motion detected.
+        # --- Step 10: Check blob areas --------------------------------------
+        # If any single blob area > threshold → motion detected.
         # This filters out small noise blobs (insects, pixel flicker) while
-        # catching real objects (people, cars, animals).
-        motion_detected = False
-        max_area = 0
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > max_area:
-                max_area = area
-            if area > self._threshold:
-                motion_detected = True
-                break  # One big contour is enough — no need to check the rest.
-
-        if not motion_detected:
+        # catching real objects (people, cars, animals). Label 0 is the
+        # background, so it is skipped.
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        max_area = int(areas.max()) if areas.size else 0
+
+        if max_area <= self._scaled_threshold:
             return False
 
-        # --- Step 10: Cooldown check ----------------------------------------
+        # --- Step 11: Cooldown check ----------------------------------------
         # Motion is real, but we only fire an alert if enough time has
         # passed since the last one to avoid spamming Telegram.
-        now = time.time()
-        elapsed = now - self._last_alert_time
+        now = time.monotonic()
+        elapsed = now - self._last_alert_monotonic
 
         if elapsed < self._cooldown:
             logger.debug(
@@ -172,10 +243,40 @@ class MotionDetector:
             return False
 
         # --- Motion confirmed and cooldown clear ----------------------------
+        # Report the area in full-resolution pixels, like the threshold.
         logger.info(
-            "Motion detected — contour area=%d px (threshold=%d px).",
-            max_area,
+            "Motion detected — blob area=%d px (threshold=%d px).",
+            max_area * self._downscale ** 2,
             self._threshold,
         )
-        self._last_alert_time = now
+        self._last_alert_monotonic = now
         return True
+
+    # -----------------------------------------------------------------
+    # Internal helpers
+    # -----------------------------------------------------------------
+
+    def _ensure_buffers(self, height: int, width: int) -> None:
+        """Allocate the work buffers for a given analysis size, if needed."""
+        if self._buf_size == (height, width):
+            return
+
+        def alloc(*shape: int) -> np.ndarray | cv2.UMat:
+            buf = np.empty(shape, np.uint8)
+            return cv2.UMat(buf) if self._use_opencl else buf
+
+        if self._downscale > 1:
+            self._buf_small = alloc(height, width, 3)
+        self._buf_gray = alloc(height, width)
+        self._buf_blur = alloc(height, width)
+        self._buf_delta = alloc(height, width)
+        self._buf_thresh = alloc(height, width)
+        self._prev_gray = alloc(height, width)
+        self._buf_size = (height, width)
+
+        # A reference frame of a different size can't be differenced.
+        self._has_reference = False
+
+    def _swap_reference(self) -> None:
+        """Make the freshly blurred frame the new reference frame."""
+        self._prev_gray, self._buf_blur = self._buf_blur, self._prev_gray
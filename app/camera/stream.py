@@ -16,7 +16,13 @@ import logging
 import cv2
 import numpy as np
 
-from app.config import RTSP_URL, RECONNECT_DELAY_SECONDS, MAX_RECONNECT_ATTEMPTS
+from app.config import (
+    RTSP_URL,
+    RECONNECT_DELAY_SECONDS,
+    MAX_RECONNECT_ATTEMPTS,
+    STREAM_OPEN_TIMEOUT_MS,
+    STREAM_READ_TIMEOUT_MS,
+)
 
 # Module-level logger. Inherits the root configuration set in main.py.
 logger = logging.getLogger(__name__)
@@ -91,11 +97,27 @@ class CameraStream:
             (cv2.CAP_ANY, "ANY"),
         ]
 
+        # Bound how long opening and each frame read may block, so a
+        # stalled stream surfaces as a failed read (and a reconnect) instead
+        # of hanging the loop. This is for responsiveness — it lets
+        # shutdown proceed during an RTSP stall — not throughput. Backends
+        # that don't support these properties ignore them.
+        params = [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, STREAM_OPEN_TIMEOUT_MS,
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, STREAM_READ_TIMEOUT_MS,
+        ]
+
         for backend_id, backend_name in backends:
             logger.info("Trying backend: %s", backend_name)
-            cap = cv2.VideoCapture(self._url, backend_id)
+            cap = cv2.VideoCapture(self._url, backend_id, params)
 
             if cap.isOpened():
+                # Keep at most one frame queued inside the backend. If the
+                # loop falls behind (e.g. during a YOLO burst) we want the
+                # newest frame, not a growing backlog of stale ones. Not all
+                # backends honour this; it is harmless where ignored.
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
                 # Verify we can actually read a frame, not just "open".
                 ret, _ = cap.read()
                 if ret:
@@ -120,6 +142,11 @@ class CameraStream:
     def read(self) -> np.ndarray | None:
         """Grab and return one frame from the stream.
 
+        Equivalent to grab() followed by retrieve(). Callers that only
+        need some of the frames (like the main loop, which decodes once
+        per YOLO_INTERVAL) should call grab() on every frame and
+        retrieve() only when a frame is actually needed.
+
         Returns:
             A BGR numpy array on success, or None if the read failed
             (indicating the stream may have dropped).
@@ -128,8 +155,44 @@ class CameraStream:
             logger.warning("read() called before connect(). Returning None.")
             return None
 
-        # ret is a boolean indicating whether the frame was captured.
-        ret, frame = self._cap.read()
+        if not self.grab():
+            return None
+
+        return self.retrieve()
+
+    def grab(self) -> bool:
+        """Advance the stream by one frame without decoding it.
+
+        Cheap compared with read(): the packet is demuxed but never
+        converted to a BGR image. Use it to keep the stream current while
+        no frame is needed, then call retrieve() to decode the latest one.
+
+        Returns:
+            True on success, False if the grab failed (the stream may
+            have dropped) or connect() has not been called.
+        """
+        if self._cap is None:
+            logger.warning("grab() called before connect().")
+            return False
+
+        if not self._cap.grab():
+            logger.warning("Frame grab failed — stream may have dropped.")
+            return False
+        return True
+
+    def retrieve(self) -> np.ndarray | None:
+        """Decode and return the most recently grabbed frame.
+
+        Returns:
+            A BGR numpy array on success, or None if decoding failed or
+            connect() has not been called.
+        """
+        if self._cap is None:
+            logger.warning("retrieve() called before connect(). Returning None.")
+            return None
+
+        # ret is a boolean indicating whether the frame was decoded.
+        ret, frame = self._cap.retrieve()
         if not ret:
             logger.warning("Frame read failed — stream may have dropped.")
             return None
@@ -12,9 +12,10 @@ from __future__ import annotations
 import os
 import sys
 import logging
+import importlib.util
 from pathlib import Path
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
 # ---------------------------------------------------------------------------
 # Resolve project paths
@@ -28,13 +29,76 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # ---------------------------------------------------------------------------
 # Load .env file
 # ---------------------------------------------------------------------------
-# load_dotenv() reads key=value pairs from the .env file and injects them
-# into os.environ. If the file is missing the app will still work as long
+# The key=value pairs from the .env file are injected into os.environ.
+# Variables already exported in the shell take precedence, as with
+# load_dotenv(). If the file is missing the app will still work as long
 # as the variables are exported in the shell environment.
+#
+# On first run the parsed values are compiled into app/_env_compiled.py, a
+# module of plain os.environ.setdefault() calls. Later starts import that
+# module (from its cached bytecode) instead of parsing .env again, until
+# .env is modified. The generated file holds secrets and is git-ignored.
 # ---------------------------------------------------------------------------
 _env_path = BASE_DIR / ".env"
-if _env_path.exists():
-    load_dotenv(_env_path)
+
+# Checked once; the result is reused instead of stat-ing the file again.
+_env_exists: bool = _env_path.exists()
+
+_env_compiled_path = Path(__file__).resolve().parent / "_env_compiled.py"
+
+
+def _compile_env(values: dict[str, str]) -> None:
+    """Write the parsed .env values out as an importable Python module."""
+    lines = [
+        "# Generated from .env by app/config.py — do not edit.",
+        "import os",
+        *(f"os.environ.setdefault({k!r}, {v!r})" for k, v in values.items()),
+    ]
+
+    # Write to a temp file and rename, so a concurrent start never imports
+    # a half-written module. Owner-only permissions, since it holds secrets.
+    tmp_path = _env_compiled_path.with_suffix(".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, _env_compiled_path)
+
+    # Drop any bytecode from an older version: .pyc invalidation compares
+    # whole-second mtimes, which a quick .env edit could fail to change.
+    try:
+        os.remove(importlib.util.cache_from_source(str(_env_compiled_path)))
+    except OSError:
+        pass
+
+
+def _load_env() -> None:
+    """Apply .env to os.environ, via the compiled module when it's current."""
+    try:
+        compiled_mtime = _env_compiled_path.stat().st_mtime_ns
+        is_current = compiled_mtime >= _env_path.stat().st_mtime_ns
+    except OSError:
+        is_current = False
+
+    if is_current:
+        try:
+            from app import _env_compiled  # noqa: F401 — imported for side effects
+            return
+        except ImportError:
+            pass
+
+    values = {k: v for k, v in dotenv_values(_env_path).items() if v is not None}
+    for key, value in values.items():
+        os.environ.setdefault(key, value)
+
+    try:
+        _compile_env(values)
+    except OSError:
+        # A read-only checkout just means parsing again next time.
+        pass
+
+
+if _env_exists:
+    _load_env()
 else:
     # Print to stderr because logging is not configured yet at import time.
     print(
@@ -62,15 +126,25 @@ TELEGRAM_CHAT_ID: str = os.getenv("TELEGRAM_CHAT_ID", "")
 # ---------------------------------------------------------------------------
 # Motion detection tuning
 # ---------------------------------------------------------------------------
-# MOTION_THRESHOLD (int): minimum contour area in pixels that qualifies
-#     as real motion. Contours smaller than this are ignored as noise.
+# MOTION_THRESHOLD (int): minimum blob area in pixels that qualifies
+#     as real motion. Blobs smaller than this are ignored as noise.
 #     For a 1080p stream (~2M pixels), 5000 catches a small moving object.
 #
 # COOLDOWN_SECONDS (int): minimum seconds between consecutive alerts.
 #     Prevents flooding Telegram when motion is continuous.
+#
+# MOTION_DOWNSCALE (int): factor by which frames are shrunk on each axis
+#     before motion analysis. 4 = 1/16 of the pixels, which is plenty for
+#     area thresholding and far cheaper. 1 disables downscaling.
+#
+# MOTION_USE_OPENCL (bool): run the motion pipeline through OpenCV's
+#     transparent API (cv2.UMat) so it executes on any OpenCL device
+#     (Intel iGPU, AMD, NVIDIA). Ignored when no OpenCL device is present.
 # ---------------------------------------------------------------------------
 MOTION_THRESHOLD: int = int(os.getenv("MOTION_THRESHOLD", "5000"))
 COOLDOWN_SECONDS: int = int(os.getenv("COOLDOWN_SECONDS", "20"))
+MOTION_DOWNSCALE: int = int(os.getenv("MOTION_DOWNSCALE", "4"))
+MOTION_USE_OPENCL: bool = os.getenv("MOTION_USE_OPENCL", "true").lower() in ("1", "true", "yes")
 
 # ---------------------------------------------------------------------------
 # Stream resilience
@@ -80,9 +154,15 @@ COOLDOWN_SECONDS: int = int(os.getenv("COOLDOWN_SECONDS", "20"))
 #
 # MAX_RECONNECT_ATTEMPTS (int): hard cap on consecutive reconnection
 #     tries. After this many failures the application exits with an error.
+#
+# STREAM_OPEN_TIMEOUT_MS / STREAM_READ_TIMEOUT_MS (int): upper bounds on how
+#     long opening the stream or reading one frame may block. Without them
+#     a stalled RTSP connection can hang the loop (and Ctrl-C) indefinitely.
 # ---------------------------------------------------------------------------
 RECONNECT_DELAY_SECONDS: int = int(os.getenv("RECONNECT_DELAY_SECONDS", "5"))
 MAX_RECONNECT_ATTEMPTS: int = int(os.getenv("MAX_RECONNECT_ATTEMPTS", "50"))
+STREAM_OPEN_TIMEOUT_MS: int = int(os.getenv("STREAM_OPEN_TIMEOUT_MS", "5000"))
+STREAM_READ_TIMEOUT_MS: int = int(os.getenv("STREAM_READ_TIMEOUT_MS", "2000"))
 
 # ---------------------------------------------------------------------------
 # YOLO object detection
@@ -94,9 +174,27 @@ MAX_RECONNECT_ATTEMPTS: int = int(os.getenv("MAX_RECONNECT_ATTEMPTS", "50"))
 #     detection to be accepted. Higher = fewer false positives.
 #
 # YOLO_INTERVAL (float): minimum seconds between YOLO inferences.
-#     0.33 ≈ 3 FPS, which balances responsiveness with CPU usage.
+#     0.33 ≈ 3 FPS, which balances responsiveness with CPU usage. This is
+#     also the decode rate: frames in between are grabbed (advancing the
+#     stream) but never decoded.
 #
 # YOLO_CLASSES (str): comma-separated list of COCO class names to detect.
+#     Also exposed pre-parsed as YOLO_CLASSES_SET (lower-cased names).
+#
+# YOLO_PRECISION (str): inference precision — one of fp32, fp16, int8.
+#     fp32 loads the .pt weights as-is. fp16 and int8 export the weights
+#     once to a TensorRT engine cached next to the .pt file, named after
+#     the precision and YOLO_IMGSZ, e.g. yolov8n_fp16_640.engine (requires
+#     a CUDA GPU; falls back to the .pt model otherwise). The first export
+#     takes several minutes, so fp16/int8 are opt-in; the default is fp32.
+#     Any other value is rejected at startup.
+#
+# YOLO_IMGSZ (int): square model input size. Frames are letterboxed to
+#     this size on every inference path, and the TensorRT engine is built
+#     for it. Must be a positive multiple of the model stride (32).
+#
+# YOLO_CALIBRATION_DATA (str): dataset YAML pointing at a folder of sample
+#     frames from the camera. Only used for int8 engine calibration.
 # ---------------------------------------------------------------------------
 YOLO_MODEL: str = os.getenv("YOLO_MODEL", "yolov8n.pt")
 YOLO_CONFIDENCE: float = float(os.getenv("YOLO_CONFIDENCE", "0.5"))
@@ -105,6 +203,14 @@ YOLO_CLASSES: str = os.getenv(
     "YOLO_CLASSES",
     "person,car,truck,motorcycle,bicycle,bus,cat,dog,bird,horse,cow,sheep,bear",
 )
+YOLO_CLASSES_SET: frozenset[str] = frozenset(
+    c.strip().lower() for c in YOLO_CLASSES.split(",") if c.strip()
+)
+YOLO_PRECISION: str = os.getenv("YOLO_PRECISION", "fp32").lower()
+YOLO_PRECISIONS: tuple[str, ...] = ("fp32", "fp16", "int8")
+YOLO_STRIDE: int = 32
+YOLO_IMGSZ: int = int(os.getenv("YOLO_IMGSZ", "640"))
+YOLO_CALIBRATION_DATA: str = os.getenv("YOLO_CALIBRATION_DATA", "")
 
 # ---------------------------------------------------------------------------
 # Data paths
@@ -118,15 +224,38 @@ DATA_DIR: Path = BASE_DIR / "data"
 SCREENSHOTS_DIR: Path = DATA_DIR / "screenshots"
 DATABASE_PATH: Path = DATA_DIR / "cctv.db"
 
+# ---------------------------------------------------------------------------
+# Image encoding
+# ---------------------------------------------------------------------------
+# JPEG_QUALITY (int): quality (0-100) for screenshots and Telegram photos.
+#     85 is visually indistinguishable from 95 for CCTV frames and both
+#     smaller and faster to encode.
+# ---------------------------------------------------------------------------
+JPEG_QUALITY: int = int(os.getenv("JPEG_QUALITY", "85"))
+
 # ---------------------------------------------------------------------------
 # Logging configuration
 # ---------------------------------------------------------------------------
 # A shared logging setup so every module writes consistent, timestamped
-# output. Level is INFO for production; change to DEBUG for development.
-# The format includes module name and line number for fast triage.
+# output. LOG_LEVEL is read from the environment, as a level name (DEBUG,
+# INFO, WARNING, ...) or a number (10, 20, ...), and defaults to WARNING so
+# the per-alert INFO lines cost nothing in production; set LOG_LEVEL=INFO to
+# see them. Unrecognised values also fall back to WARNING.
+#
+# The production format omits the line number. At DEBUG level the format
+# adds it back for fast triage.
 # ---------------------------------------------------------------------------
-LOG_LEVEL: int = logging.INFO
-LOG_FORMAT: str = "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(message)s"
+_log_level_name = os.getenv("LOG_LEVEL", "WARNING").strip().upper()
+# getLevelName() maps a registered level name to its number and returns a
+# string for anything else; only a real level number is kept.
+_log_level = (
+    int(_log_level_name)
+    if _log_level_name.isdigit()
+    else logging.getLevelName(_log_level_name)
+)
+LOG_LEVEL: int = _log_level if isinstance(_log_level, int) else logging.WARNING
+LOG_FORMAT_PROD: str = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
+LOG_FORMAT_DEBUG: str = "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(message)s"
 LOG_DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
 
 
@@ -136,9 +265,15 @@ def setup_logging() -> None:
     Called once at application startup in main.py. All modules that use
     logging.getLogger(__name__) automatically inherit this configuration.
     """
+    # None of the formats use thread or process fields, so skip collecting
+    # them for every log record.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     logging.basicConfig(
         level=LOG_LEVEL,
-        format=LOG_FORMAT,
+        format=LOG_FORMAT_DEBUG if LOG_LEVEL <= logging.DEBUG else LOG_FORMAT_PROD,
         datefmt=LOG_DATE_FORMAT,
     )
 
@@ -150,17 +285,37 @@ def validate_config() -> None:
     instead of a cryptic failure minutes later when a module first
     tries to use a missing value.
     """
-    missing: list[str] = []
-
-    if not RTSP_URL:
-        missing.append("RTSP_URL")
-    if not TELEGRAM_TOKEN:
-        missing.append("TELEGRAM_TOKEN")
-    if not TELEGRAM_CHAT_ID:
-        missing.append("TELEGRAM_CHAT_ID")
+    missing = tuple(
+        name
+        for name, value in (
+            ("RTSP_URL", RTSP_URL),
+            ("TELEGRAM_TOKEN", TELEGRAM_TOKEN),
+            ("TELEGRAM_CHAT_ID", TELEGRAM_CHAT_ID),
+        )
+        if not value
+    )
 
     if missing:
+        hint = (
+            f"Add them to {_env_path}"
+            if _env_exists
+            else f"Create a .env file at {_env_path}"
+        )
         raise EnvironmentError(
             f"Missing required environment variables: {', '.join(missing)}. "
-            f"Create a .env file at {_env_path} — see .env.example for reference."
+            f"{hint} — see .env.example for reference."
+        )
+
+    if YOLO_PRECISION not in YOLO_PRECISIONS:
+        raise EnvironmentError(
+            f"Invalid YOLO_PRECISION={YOLO_PRECISION!r}; "
+            f"expected one of: {', '.join(YOLO_PRECISIONS)}."
+        )
+
+    # The GPU path hands YOLO a pre-letterboxed YOLO_IMGSZ tensor, which
+    # Ultralytics rejects unless the size is a multiple of the stride.
+    if YOLO_IMGSZ <= 0 or YOLO_IMGSZ % YOLO_STRIDE:
+        raise EnvironmentError(
+            f"Invalid YOLO_IMGSZ={YOLO_IMGSZ}; "
+            f"must be a positive multiple of {YOLO_STRIDE} (e.g. 640)."
         )
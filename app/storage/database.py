@@ -7,18 +7,22 @@
 # Table schema — `events`:
 #   id          INTEGER PRIMARY KEY AUTOINCREMENT
 #   timestamp   TEXT    ISO-8601 datetime when motion was detected
-#   screenshot  TEXT    Absolute path to the saved JPEG file
+#   screenshot  TEXT    Absolute path to the saved JPEG file ('' if not saved)
 #   notified    INTEGER 1 if Telegram alert was sent, 0 if it failed
 #
 # SQLite is ideal here: it's serverless, zero-config, ships with Python,
 # and handles the modest write throughput of a single-camera system easily.
+#
+# Events are buffered in memory and written in batches (see insert_event),
+# so a burst of alerts costs one commit rather than one fsync per event.
 # =============================================================================
 
 from __future__ import annotations
 
 import sqlite3
 import logging
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
 
 from app.config import DATABASE_PATH, DATA_DIR
@@ -32,8 +36,39 @@ logger = logging.getLogger(__name__)
 # We keep a single connection open for the lifetime of the process.
 # SQLite in WAL mode supports concurrent reads and serialised writes,
 # which is perfectly fine for a single-threaded alert loop.
+#
+# The connection runs in autocommit mode (isolation_level=None): the
+# sqlite3 module issues no implicit BEGIN, and batch writes open their
+# own transaction explicitly. It may be used from any thread; _lock
+# serialises access to it and to the pending-write buffer.
 # ---------------------------------------------------------------------------
 _connection: sqlite3.Connection | None = None
+_lock = threading.Lock()
+
+# The insert statement as a single module-level constant, so every flush
+# passes the same string and hits the connection's prepared-statement cache.
+_INSERT_EVENT_SQL: str = (
+    "INSERT INTO events (timestamp, screenshot, notified, detected_objects) "
+    "VALUES (?, ?, ?, ?);"
+)
+
+# ---------------------------------------------------------------------------
+# Pending-write buffer
+# ---------------------------------------------------------------------------
+# insert_event() appends rows here; they are written with one executemany()
+# and commit once the buffer holds _FLUSH_MAX_ROWS rows, or by
+# flush_if_stale() (called from the main loop on every tick) once the
+# oldest buffered row is _FLUSH_MAX_SECONDS old. close_db() flushes
+# whatever is left.
+# ---------------------------------------------------------------------------
+_FLUSH_MAX_ROWS: int = 32
+_FLUSH_MAX_SECONDS: float = 2.0
+
+_pending: list[tuple[str, str, int, str]] = []
+
+# time.monotonic() reading of when the oldest row in _pending was queued.
+# Only meaningful while _pending is non-empty.
+_first_pending: float = 0.0
 
 
 def _get_connection() -> sqlite3.Connection:
@@ -55,13 +90,30 @@ def _get_connection() -> sqlite3.Connection:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
     logger.info("Opening database: %s", DATABASE_PATH)
-    _connection = sqlite3.connect(str(DATABASE_PATH))
+    _connection = sqlite3.connect(
+        str(DATABASE_PATH),
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=256,
+    )
 
     # Enable WAL mode. This allows readers to proceed without blocking
     # behind a writer, and vice-versa. It also reduces the chance of
     # database corruption if the process is killed mid-write.
     _connection.execute("PRAGMA journal_mode=WAL;")
 
+    # In WAL mode, synchronous=NORMAL only fsyncs at checkpoints rather than
+    # on every commit; the database stays consistent, and at worst the last
+    # few commits are lost on power failure. Temp tables and a small page
+    # cache live in memory.
+    _connection.execute("PRAGMA synchronous=NORMAL;")
+    _connection.execute("PRAGMA temp_store=MEMORY;")
+    _connection.execute("PRAGMA cache_size=-2000;")
+
+    # Keep dirty pages in the page cache until commit instead of spilling
+    # them to the database file mid-transaction.
+    _connection.execute("PRAGMA cache_spill=0;")
+
     # Return rows as sqlite3.Row objects so columns can be accessed by name.
     _connection.row_factory = sqlite3.Row
 
@@ -88,56 +140,114 @@ def init_db() -> None:
         );
         """
     )
-    conn.commit()
+
+    # Index for time-range queries (reports, retention clean-up).
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events(timestamp);")
 
     # Migration for existing databases that lack the detected_objects column.
-    try:
+    # Check the schema first rather than attempting the ALTER and relying on
+    # the "duplicate column" error on every startup.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(events);")}
+    if "detected_objects" not in columns:
         conn.execute("ALTER TABLE events ADD COLUMN detected_objects TEXT NOT NULL DEFAULT '';")
-        conn.commit()
         logger.info("Migrated events table — added detected_objects column.")
-    except sqlite3.OperationalError:
-        # Column already exists — nothing to do.
-        pass
 
     logger.info("Database initialised — events table ready.")
 
 
 def insert_event(
-    screenshot_path: Path,
+    screenshot_path: Path | None,
     notified: bool,
     detected_objects: str = "",
-) -> int:
-    """Insert a new detection event record.
+) -> None:
+    """Queue a new detection event record for writing.
+
+    The row is buffered and written together with other pending rows,
+    either here once the batch is full or by flush_if_stale() once the
+    oldest row has waited _FLUSH_MAX_SECONDS.
 
     Args:
-        screenshot_path:  Absolute path to the JPEG file saved for this event.
+        screenshot_path:  Absolute path to the JPEG file saved for this event,
+                          or None if the screenshot could not be saved
+                          (stored as an empty string).
         notified:         Whether the Telegram alert was sent successfully.
         detected_objects: Comma-separated list of detected object labels
                           (e.g. "2x person, 1x car"). Defaults to empty string.
+    """
+    # ISO-8601 timestamp (second resolution) for human-readable querying.
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    screenshot = str(screenshot_path) if screenshot_path is not None else ""
+    row = (now, screenshot, int(notified), detected_objects)
+    # Guarded so screenshot_path.name isn't computed when INFO is off.
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Event queued — screenshot=%s, notified=%s, objects=%s.",
+            screenshot_path.name if screenshot_path is not None else "(none)",
+            notified,
+            detected_objects or "(none)",
+        )
+
+    global _first_pending
+
+    with _lock:
+        if not _pending:
+            _first_pending = time.monotonic()
+        _pending.append(row)
+        if len(_pending) >= _FLUSH_MAX_ROWS:
+            _flush_pending()
+
+
+def flush_if_stale() -> None:
+    """Write buffered events once the oldest has waited _FLUSH_MAX_SECONDS.
+
+    Called from the main loop on every tick. Cheap when nothing is
+    buffered, which is almost always.
+    """
+    if not _pending:
+        return
 
-    Returns:
-        The auto-generated row ID of the new record.
+    with _lock:
+        if time.monotonic() - _first_pending >= _FLUSH_MAX_SECONDS:
+            _flush_pending()
+
+
+def _flush_pending() -> None:
+    """Write all buffered events in a single transaction.
+
+    BEGIN IMMEDIATE takes the write lock up front, so the batch can't fail
+    half-way on a lock upgrade. The caller must hold _lock.
+
+    Database errors (locked, disk full, ...) are logged rather than raised,
+    so a transient failure never stops the monitoring loop. The rows stay
+    buffered and are retried after another _FLUSH_MAX_SECONDS.
     """
-    conn = _get_connection()
+    global _first_pending
 
-    # ISO-8601 timestamp for human-readable querying.
-    now = datetime.now().isoformat()
+    if not _pending:
+        return
 
-    cursor = conn.execute(
-        "INSERT INTO events (timestamp, screenshot, notified, detected_objects) VALUES (?, ?, ?, ?);",
-        (now, str(screenshot_path), int(notified), detected_objects),
-    )
-    conn.commit()
-
-    row_id = cursor.lastrowid
-    logger.info(
-        "Event #%d recorded — screenshot=%s, notified=%s, objects=%s.",
-        row_id,
-        screenshot_path.name,
-        notified,
-        detected_objects or "(none)",
-    )
-    return row_id
+    try:
+        conn = _get_connection()
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            conn.executemany(_INSERT_EVENT_SQL, _pending)
+            conn.execute("COMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            raise
+    except sqlite3.Error as exc:
+        logger.error(
+            "Failed to write %d event(s) to the database: %s — will retry.",
+            len(_pending),
+            exc,
+        )
+        _first_pending = time.monotonic()
+        return
+
+    logger.info("Wrote %d event(s) to the database.", len(_pending))
+    _pending.clear()
 
 
 def close_db() -> None:
@@ -148,7 +258,16 @@ def close_db() -> None:
     """
     global _connection
 
-    if _connection is not None:
-        _connection.close()
-        _connection = None
-        logger.info("Database connection closed.")
+    with _lock:
+        try:
+            # Write any buffered events first (this opens the connection if
+            # needed). Rows that still can't be written are lost here.
+            _flush_pending()
+            if _pending:
+                logger.error("Dropping %d unwritten event(s).", len(_pending))
+                _pending.clear()
+        finally:
+            if _connection is not None:
+                _connection.close()
+                _connection = None
+                logger.info("Database connection closed.")
@@ -7,43 +7,173 @@
 #   2025-01-15_14-30-45.jpg
 #
 # The directory is created automatically on first use if it doesn't exist.
+#
+# Each alert frame is JPEG-encoded once with encode_jpeg(); the same bytes
+# are uploaded to Telegram and handed to save_screenshot(). The disk write
+# happens on a background writer thread, so the detection loop never waits
+# on the disk. Call close_screenshots() at shutdown to flush queued files.
 # =============================================================================
 
+from __future__ import annotations
+
 import logging
-from datetime import datetime
+import os
+import queue
+import threading
+import time
 from pathlib import Path
 
 import cv2
 import numpy as np
 
-from app.config import SCREENSHOTS_DIR
+from app.config import SCREENSHOTS_DIR, JPEG_QUALITY
 
 # Module-level logger.
 logger = logging.getLogger(__name__)
 
+# Encoder settings passed to cv2.imencode. Huffman optimisation and
+# progressive mode are left off because both add encode passes for little
+# size benefit.
+_JPEG_PARAMS: list[int] = [
+    cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY,
+    cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+    cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+]
+
+# ---------------------------------------------------------------------------
+# Optional PyTurboJPEG encoder
+# ---------------------------------------------------------------------------
+# opencv-python also encodes with libjpeg-turbo, but the copy bundled in
+# its wheels is often older and built for a generic CPU. PyTurboJPEG calls
+# the system libjpeg-turbo directly, which is usually a newer build with
+# the SIMD paths for the host CPU, and skips OpenCV's imencode wrapper. It
+# is optional: if the package or the shared library is missing, encoding
+# falls back to cv2.imencode.
+# ---------------------------------------------------------------------------
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+
+    _tj: TurboJPEG | None = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _tj = None
+
+# ---------------------------------------------------------------------------
+# Background writer
+# ---------------------------------------------------------------------------
+# save_screenshot() enqueues (jpeg_bytes, path) pairs; a daemon thread
+# writes them. The queue is bounded so a stalled disk can't grow memory
+# without limit. A None item tells the thread to exit.
+# ---------------------------------------------------------------------------
+_QUEUE_MAX_FRAMES: int = 16
+
+# How long close_screenshots() waits for queued frames to be written before
+# giving up, so a stalled disk can't hang shutdown.
+_CLOSE_TIMEOUT_SECONDS: float = 10.0
+
+_writer_q: queue.Queue[tuple[bytes, str] | None] = queue.Queue(
+    maxsize=_QUEUE_MAX_FRAMES
+)
+_writer_thread: threading.Thread | None = None
+
+# The directory as a plain string. The save path joins filenames with
+# os.path instead of building intermediate Path objects; a Path is only
+# created for the return value.
+_SHOT_DIR_STR: str = str(SCREENSHOTS_DIR)
+
+# Set once the screenshots directory is known to exist, so later saves
+# skip the mkdir syscall.
+_dir_ready: bool = False
+
 
 def ensure_directory() -> None:
     """Create the screenshots directory if it doesn't already exist.
 
     Uses parents=True so any missing intermediate directories are also
     created (e.g. if data/ itself is absent). exist_ok=True makes the
-    call idempotent — safe to call on every save without checking first.
+    call idempotent. After the first success the call is a no-op.
     """
+    global _dir_ready
+
+    if _dir_ready:
+        return
     SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+    _dir_ready = True
 
 
-def save_screenshot(frame: np.ndarray) -> Path:
-    """Write a BGR frame to disk as a timestamped JPEG.
+def encode_jpeg(frame: np.ndarray) -> bytes | None:
+    """Encode a BGR frame to JPEG, preferring PyTurboJPEG when available.
+
+    The result is used both for the screenshot file and the Telegram
+    upload, so each alert frame is encoded exactly once.
 
     Args:
-        frame: The BGR numpy array captured from the camera.
+        frame: The BGR numpy array to encode.
 
     Returns:
-        The Path object pointing to the saved file. This is passed to
-        the Telegram alert module and stored in the database record.
+        The encoded JPEG bytes, or None if encoding failed.
+    """
+    try:
+        if _tj is not None:
+            return _tj.encode(frame, quality=JPEG_QUALITY, pixel_format=TJPF_BGR)
+
+        ok, buf = cv2.imencode(".jpg", frame, _JPEG_PARAMS)
+    except (cv2.error, OSError) as exc:
+        # PyTurboJPEG reports encoder failures as OSError.
+        logger.error("Failed to encode JPEG: %s", exc)
+        return None
+    return buf.tobytes() if ok else None
+
+
+def _writer_loop() -> None:
+    """Write queued JPEG files until a None sentinel arrives."""
+    while True:
+        item = _writer_q.get()
+        if item is None:
+            return
+
+        jpeg_bytes, filepath = item
+        try:
+            with open(filepath, "wb") as f:
+                f.write(jpeg_bytes)
+        except Exception as exc:
+            # Disk full, bad permissions, etc. Log and keep serving the
+            # queue — if this thread died, the queue would fill and every
+            # later save_screenshot() would fail.
+            logger.error("Failed to write screenshot to %s: %s", filepath, exc)
+            continue
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Screenshot saved: %s", filepath)
+
+
+def _ensure_writer() -> None:
+    """Start the writer thread if it isn't running yet."""
+    global _writer_thread
+
+    if _writer_thread is None or not _writer_thread.is_alive():
+        _writer_thread = threading.Thread(
+            target=_writer_loop,
+            name="screenshot-writer",
+            daemon=True,
+        )
+        _writer_thread.start()
+
+
+def save_screenshot(jpeg_bytes: bytes) -> Path:
+    """Queue an encoded JPEG to be written to disk as a timestamped file.
+
+    The write happens on the background writer thread; write failures are
+    logged there.
+
+    Args:
+        jpeg_bytes: The frame as encoded by encode_jpeg().
+
+    Returns:
+        The Path the file will be written to. This is stored in the
+        database record.
 
     Raises:
-        IOError: If cv2.imwrite fails (e.g. disk full, bad permissions).
+        IOError: If the write queue is full (the disk can't keep up).
     """
     # Make sure the target directory exists before writing.
     ensure_directory()
@@ -51,16 +181,52 @@ def save_screenshot(frame: np.ndarray) -> Path:
     # Build a filename from the current local time.
     # Format: YYYY-MM-DD_HH-MM-SS.jpg
     # Colons are avoided because they are illegal in filenames on macOS/Windows.
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    filename = f"{timestamp}.jpg"
-    filepath = SCREENSHOTS_DIR / filename
+    # time.strftime formats the local time directly, without building a
+    # datetime object first.
+    filename = time.strftime("%Y-%m-%d_%H-%M-%S.jpg")
+    filepath = os.path.join(_SHOT_DIR_STR, filename)
 
-    # cv2.imwrite returns True on success.
-    # JPEG quality defaults to 95 which is a good size/quality trade-off.
-    success = cv2.imwrite(str(filepath), frame)
+    _ensure_writer()
+    try:
+        _writer_q.put_nowait((jpeg_bytes, filepath))
+    except queue.Full:
+        raise IOError(f"Screenshot queue full — dropped {filepath}")
 
-    if not success:
-        raise IOError(f"Failed to write screenshot to {filepath}")
+    return Path(filepath)
 
-    logger.info("Screenshot saved: %s", filepath)
-    return filepath
+
+def close_screenshots() -> None:
+    """Write any queued screenshots and stop the writer thread.
+
+    Called during application shutdown. Safe to call even if no
+    screenshot was ever saved. Waits at most _CLOSE_TIMEOUT_SECONDS each
+    for room in the queue and for the writer to finish; if it is still
+    running after that, the remaining files are reported as dropped and
+    the thread is left to die with the process.
+    """
+    global _writer_thread
+
+    if _writer_thread is None:
+        return
+
+    if _writer_thread.is_alive():
+        try:
+            _writer_q.put(None, timeout=_CLOSE_TIMEOUT_SECONDS)
+        except queue.Full:
+            logger.warning(
+                "Screenshot writer stalled — dropping %d queued file(s).",
+                _writer_q.qsize(),
+            )
+            return
+
+        _writer_thread.join(timeout=_CLOSE_TIMEOUT_SECONDS)
+        if _writer_thread.is_alive():
+            # The stop sentinel is still queued behind the files.
+            logger.warning(
+                "Screenshot writer stalled — dropping %d queued file(s).",
+                max(_writer_q.qsize() - 1, 0),
+            )
+            return
+
+    _writer_thread = None
+    logger.info("Screenshot writer stopped.")